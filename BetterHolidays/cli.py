@@ -0,0 +1,182 @@
+import argparse
+import collections
+import concurrent.futures as cf
+import csv
+import datetime as dt
+import io
+import itertools as it
+import json
+import sys
+import typing as t
+from .days import Holiday, TradingDay, day_kind
+from .const import KIND_NAMES
+from .multi import get_market
+from .markets import MARKETS
+from .markets.cache import CacheMiss
+
+FIELDS = ["date", "kind", "name", "open_time", "close_time"]
+OFFSET_FIELDS = ["open_offset", "close_offset"]
+
+# Years each market has no data for, kept for the life of the process so they're only fetched once
+MISSING_YEARS: 'dict[str, set[int]]' = {}
+
+def iter_lines(paths: 'list[str]') -> 't.Iterator[str]':
+    """Yield stripped, non-empty lines from paths ("-" is stdin)."""
+    for path in paths or ["-"]:
+        if path == "-":
+            f = sys.stdin
+        else:
+            f = open(path, "r")
+        try:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def iter_chunks(lines: 't.Iterable[str]', size: 'int') -> 't.Iterator[list[str]]':
+    lines = iter(lines)
+    while True:
+        chunk = list(it.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def parse_date(value: 'str') -> 't.Optional[dt.date]':
+    try:
+        return dt.date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+def empty_row(date: 'str', kind: 'str', offsets: 'bool') -> 'dict':
+    row = {"date": date, "kind": kind, "name": "", "open_time": "", "close_time": ""}
+    if offsets:
+        row.update(open_offset="", close_offset="")
+    return row
+
+def classify_chunk(market_name: 'str', lines: 'list[str]', offsets: 'bool', fmt: 'str') -> 'str':
+    """
+    Classify a chunk of date strings against market and return the formatted output.
+
+    Each year in the chunk is loaded once up front, then every row is a cache lookup.
+    Lines that aren't dates are "invalid" and dates the market has no data for are "unknown".
+    Errors fetching a year (e.g. network failures) are raised.
+    """
+    market = get_market(market_name)
+    dates = [parse_date(line) for line in lines]
+
+    sessions = {}
+    missing = MISSING_YEARS.setdefault(market_name, set())
+    for year in {date.year for date in dates if date is not None} - missing:
+        try:
+            market.day(dt.date(year, 1, 1))
+        except CacheMiss:
+            missing.add(year)
+            continue
+        if offsets:
+            sessions[year] = market.get_sessions(year)
+
+    rows = []
+    for line, date in zip(lines, dates):
+        if date is None:
+            rows.append(empty_row(line, "invalid", offsets))
+            continue
+
+        # The year is loaded by now, so a missing day is reported rather than fetched again
+        day = None if date.year in missing else market.cache.get(date)
+        if day is None:
+            rows.append(empty_row(date.isoformat(), "unknown", offsets))
+            continue
+
+        row = {
+            "date": date.isoformat(),
+            "kind": KIND_NAMES[day_kind(day)],
+            "name": day.name if isinstance(day, Holiday) else "",
+            "open_time": day.open_time.isoformat() if isinstance(day, TradingDay) else "",
+            "close_time": day.close_time.isoformat() if isinstance(day, TradingDay) else "",
+        }
+        if offsets:
+            index = date.timetuple().tm_yday - 1
+            row.update(open_offset=sessions[date.year][index], close_offset=sessions[date.year][index + 1])
+        rows.append(row)
+
+    out = io.StringIO()
+    if fmt == "json":
+        for row in rows:
+            out.write(json.dumps(row))
+            out.write("\n")
+    else:
+        writer = csv.DictWriter(out, fieldnames=FIELDS + (OFFSET_FIELDS if offsets else []), lineterminator="\n")
+        writer.writerows(rows)
+    return out.getvalue()
+
+def classify(args: 'argparse.Namespace'):
+    chunks = iter_chunks(iter_lines(args.files), args.chunk_size)
+    out = sys.stdout
+
+    if args.format == "csv" and not args.no_header:
+        out.write(",".join(FIELDS + (OFFSET_FIELDS if args.offsets else [])) + "\n")
+
+    if args.jobs == 1:
+        for chunk in chunks:
+            out.write(classify_chunk(args.market, chunk, args.offsets, args.format))
+        return
+
+    # Keep a bounded number of chunks in flight so memory stays constant and output stays in order.
+    with cf.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(classify_chunk, args.market, chunk, args.offsets, args.format))
+            if len(pending) >= args.jobs * 2:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+
+def serve(args: 'argparse.Namespace'):
+    from .server import CalendarServer
+
+    server = CalendarServer(refresh_interval=args.refresh)
+    server.serve(args.unix if args.unix else (args.host, args.port))
+
+def positive_int(value: 'str') -> 'int':
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def build_parser() -> 'argparse.ArgumentParser':
+    parser = argparse.ArgumentParser(prog="better-holidays", description="A better way to get market holidays")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    classify_parser = commands.add_parser("classify", help="Classify ISO dates read from files or stdin")
+    classify_parser.add_argument("files", nargs="*", help="Files to read dates from, one per line (default: stdin)")
+    classify_parser.add_argument("-m", "--market", default="NYSE", choices=sorted(MARKETS), help="Market to classify against")
+    classify_parser.add_argument("-f", "--format", default="csv", choices=["csv", "json"], help="Output format")
+    classify_parser.add_argument("--offsets", action="store_true", help="Include open seconds from the start of the year at each day's open and close")
+    classify_parser.add_argument("--no-header", action="store_true", help="Don't write the CSV header")
+    classify_parser.add_argument("--chunk-size", type=positive_int, default=65536, help="Number of dates per chunk")
+    classify_parser.add_argument("-j", "--jobs", type=positive_int, default=1, help="Number of processes to classify chunks in parallel")
+    classify_parser.set_defaults(func=classify)
+
+    serve_parser = commands.add_parser("serve", help="Serve the calendars of every market to local clients")
+    serve_parser.add_argument("--unix", help="Unix socket path to listen on (default: TCP)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Host to listen on")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    serve_parser.add_argument("--refresh", type=float, default=24 * 60 * 60, help="Seconds between refreshes of the current and future years")
+    serve_parser.set_defaults(func=serve)
+
+    return parser
+
+def main(argv: 't.Optional[list[str]]' = None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        sys.stderr.close()
+    except ValueError as e:
+        sys.exit(f"better-holidays: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -48,3 +48,8 @@ DAYS_IN_MONTH = {
     "DECEMBER": 31
 }
 
+
+# Day kinds used by the ordinal tables. Bit 1 is set on trading days and bit 2 on holidays,
+# so a partial trading day is both.
+KIND_NON_TRADING, KIND_TRADING, KIND_HOLIDAY, KIND_PARTIAL = 0, 1, 2, 3
+KIND_NAMES = ("non-trading", "trading", "holiday", "partial")
@@ -1,5 +1,6 @@
 import dataclasses as dc
 import datetime as dt
+from .const import KIND_NON_TRADING, KIND_TRADING, KIND_HOLIDAY
 
 @dc.dataclass(frozen=True)
 class Day:
@@ -30,3 +31,13 @@ class PartialTradingDay(TradingDay, Holiday):
     late_open: bool = False
     early_close_reason: str = ""
     late_open_reason: str = ""
+
+
+def day_kind(day: 'Day') -> 'int':
+    """Return the KIND_* constant for day."""
+    kind = KIND_NON_TRADING
+    if isinstance(day, TradingDay):
+        kind |= KIND_TRADING
+    if isinstance(day, Holiday):
+        kind |= KIND_HOLIDAY
+    return kind
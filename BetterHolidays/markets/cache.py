@@ -1,19 +1,30 @@
 import datetime as dt
 import typing as t
-from ..days import Day
+from ..days import Day, day_kind
 from ..utils import NOT_SET
 
 T = t.TypeVar("T")
 
+class CacheMiss(ValueError):
+    """Raised when a market has no data for a date, even after fetching its year."""
+
 class Cache:
     def __init__(self):
         self.cache: 'dict[dt.date, Day]' = {}
+        self.sessions: 'dict[int, list[int]]' = {}
+        self.kinds = bytearray()
+        self.kinds_start = 0
 
     def get(self, key: 'dt.date') -> 't.Optional[Day]':
         return self.cache.get(key)
 
     def set(self, key: 'dt.date', value: 'Day'):
         self.cache[key] = value
+        self.sessions.pop(key.year, None)
+        if self.kinds:
+            index = key.toordinal() - self.kinds_start
+            if 0 <= index < len(self.kinds):
+                self.kinds[index] = day_kind(value)
 
     def get_or_set(self, key: 'dt.date', func: 't.Callable[[int], None]') -> 'Day':
         if key in self.cache:
@@ -21,10 +32,25 @@ class Cache:
         func(key.year)
         if key in self.cache:
             return self.get(key)
-        raise ValueError("Cache miss")
+        raise CacheMiss("Cache miss")
 
     def clear(self):
         self.cache.clear()
+        self.sessions.clear()
+        self.clear_kinds()
+
+    def clear_kinds(self):
+        self.kinds = bytearray()
+        self.kinds_start = 0
+
+    def clear_year(self, year: 'int'):
+        for key in [key for key in self.cache if key.year == year]:
+            del self.cache[key]
+        self.sessions.pop(year, None)
+        self.clear_kinds()
+
+    def years(self) -> 'set[int]':
+        return {key.year for key in self.cache}
 
     @t.overload
     def pop(self, key:'dt.date') -> 'Day': ...
@@ -33,6 +59,8 @@ class Cache:
     def pop(self, key:'dt.date', default:'T') -> 't.Union[Day, T]': ...
 
     def pop(self, key, default=NOT_SET):
+        self.sessions.pop(key.year, None)
+        self.clear_kinds()
         if default == NOT_SET:     
             return self.cache.pop(key)
 
@@ -1,11 +1,14 @@
 import datetime as dt
 import typing as t
+import bisect
 from abc import ABC, abstractmethod
-from ..days import Day, Holiday, TradingDay, PartialTradingDay
-from ..const import DAYS_TYPE
+from ..days import Day, Holiday, TradingDay, PartialTradingDay, day_kind
+from ..const import DAYS_TYPE, KIND_TRADING, KIND_HOLIDAY
 from ..utils import iterate_date, abstract_const, classproperty
 from .cache import Cache
 
+MAX_ORDINAL = dt.date.max.toordinal()
+
 class Market(ABC):
     cache: 'Cache'
 
@@ -17,6 +20,8 @@ class Market(ABC):
     include_country_holidays = abstract_const()
     excluded_country_holidays = abstract_const()
     _weekends = None
+    # How many years the ordinal table grows by on a lookup outside it; further lookups use day()
+    ordinal_gap = 5
 
     @classmethod
     def validate_options(cls):
@@ -105,4 +110,195 @@ class Market(ABC):
 
     @classmethod
     def day(cls, date: 'dt.date') -> 'Day':
-        return cls.cache.get_or_set(date, cls.fetch_data)
\ No newline at end of file
+        return cls.cache.get_or_set(date, cls.fetch_data)
+
+    @staticmethod
+    def session_length(day: 'Day') -> 'int':
+        """Return the number of seconds the market is open on day."""
+        if not isinstance(day, TradingDay):
+            return 0
+        open_time = dt.datetime.combine(day.date, day.open_time)
+        close_time = dt.datetime.combine(day.date, day.close_time)
+        return max(int((close_time - open_time).total_seconds()), 0)
+
+    @classmethod
+    def get_sessions(cls, year: 'int') -> 'list[int]':
+        """
+        Return the cumulative open seconds for year.
+
+        Index i holds the open seconds before the i-th day of the year (0 based),
+        so the last element is the total open seconds of the year.
+        """
+        sessions = cls.cache.sessions.get(year)
+        if sessions is not None:
+            return sessions
+
+        total = 0
+        sessions = [0]
+        for day in iterate_date(dt.date(year, 1, 1), dt.date(year, 12, 31)):
+            total += cls.session_length(cls.day(day))
+            sessions.append(total)
+
+        cls.cache.sessions[year] = sessions
+        return sessions
+
+    @classmethod
+    def _open_offset(cls, time: 'dt.datetime') -> 'float':
+        """Return the open seconds between the start of time's year and time."""
+        sessions = cls.get_sessions(time.year)
+        offset = sessions[time.timetuple().tm_yday - 1]
+
+        day = cls.day(time.date())
+        if not isinstance(day, TradingDay):
+            return offset
+
+        open_time = dt.datetime.combine(day.date, day.open_time)
+        elapsed = (time - open_time).total_seconds()
+        return offset + min(max(elapsed, 0), cls.session_length(day))
+
+    @classmethod
+    def open_seconds_between(cls, start: 'dt.datetime', end: 'dt.datetime') -> 'float':
+        """
+        Return the number of seconds the market is open between start and end.
+        Times are naive and in the market's local time. Negative if end is before start.
+        """
+        if end < start:
+            return -cls.open_seconds_between(end, start)
+
+        seconds = cls._open_offset(end) - cls._open_offset(start)
+        for year in range(start.year, end.year):
+            seconds += cls.get_sessions(year)[-1]
+        return seconds
+
+    @classmethod
+    def offset_open_time(cls, start: 'dt.datetime', seconds: 'float') -> 'dt.datetime':
+        """
+        Return the time after start at which the market has been open for seconds.
+        Negative seconds go backwards from start.
+        """
+        if seconds == 0:
+            return start
+
+        year = start.year
+        target = cls._open_offset(start) + seconds
+
+        if seconds > 0:
+            while target > cls.get_sessions(year)[-1]:
+                target -= cls.get_sessions(year)[-1]
+                year += 1
+            sessions = cls.get_sessions(year)
+            index = bisect.bisect_left(sessions, target) - 1
+        else:
+            while target < 0:
+                year -= 1
+                target += cls.get_sessions(year)[-1]
+            sessions = cls.get_sessions(year)
+            index = bisect.bisect_right(sessions, target) - 1
+
+        day = cls.day(dt.date(year, 1, 1) + dt.timedelta(days=index))
+        return dt.datetime.combine(day.date, day.open_time) + dt.timedelta(seconds=target - sessions[index])
+
+    @classmethod
+    def load_ordinals(cls, start_year: 'int', end_year: 't.Optional[int]' = None):
+        """
+        Extend the ordinal kind table so it covers start_year to end_year (inclusive).
+        The table stays contiguous, so any gap between it and the new years is loaded too.
+        Ordinals are proleptic Gregorian (see dt.date.toordinal), so 1 to dt.date.max.toordinal().
+        """
+        end_year = start_year if end_year is None else end_year
+        cache = cls.cache
+        start = dt.date(start_year, 1, 1).toordinal()
+        end = dt.date(end_year, 12, 31).toordinal()
+
+        if cache.kinds:
+            old_start = cache.kinds_start
+            old_end = old_start + len(cache.kinds) - 1
+            if old_start <= start and end <= old_end:
+                return
+            start = min(start, dt.date(dt.date.fromordinal(old_start).year, 1, 1).toordinal())
+            end = max(end, dt.date(dt.date.fromordinal(old_end).year, 12, 31).toordinal())
+        else:
+            old_start, old_end = end + 1, end
+
+        prefix = bytearray(day_kind(cls.day(dt.date.fromordinal(n))) for n in range(start, min(old_start, end + 1)))
+        suffix = bytearray(day_kind(cls.day(dt.date.fromordinal(n))) for n in range(max(old_end + 1, start), end + 1))
+        cache.kinds = prefix + cache.kinds + suffix
+        cache.kinds_start = start
+
+    @classmethod
+    def kind_of_ordinal(cls, n: 'int') -> 'int':
+        """
+        Return the KIND_* constant for the proleptic ordinal n (see dt.date.toordinal).
+
+        Lookups up to ordinal_gap years outside the table extend it, anything further
+        is answered through day() without growing the table.
+        """
+        cache = cls.cache
+        index = n - cache.kinds_start
+        if 0 <= index < len(cache.kinds):
+            return cache.kinds[index]
+
+        if not 1 <= n <= MAX_ORDINAL:
+            raise ValueError(f"Ordinal {n} is out of range 1 to {MAX_ORDINAL}")
+
+        date = dt.date.fromordinal(n)
+        if cache.kinds:
+            first = dt.date.fromordinal(cache.kinds_start).year
+            last = dt.date.fromordinal(cache.kinds_start + len(cache.kinds) - 1).year
+            if first - date.year > cls.ordinal_gap or date.year - last > cls.ordinal_gap:
+                return day_kind(cls.day(date))
+
+        cls.load_ordinals(date.year)
+        return cache.kinds[n - cache.kinds_start]
+
+    @classmethod
+    def is_trading_ordinal(cls, n: 'int') -> 'bool':
+        cache = cls.cache
+        index = n - cache.kinds_start
+        if 0 <= index < len(cache.kinds):
+            return bool(cache.kinds[index] & KIND_TRADING)
+        return bool(cls.kind_of_ordinal(n) & KIND_TRADING)
+
+    @classmethod
+    def is_holiday_ordinal(cls, n: 'int') -> 'bool':
+        cache = cls.cache
+        index = n - cache.kinds_start
+        if 0 <= index < len(cache.kinds):
+            return bool(cache.kinds[index] & KIND_HOLIDAY)
+        return bool(cls.kind_of_ordinal(n) & KIND_HOLIDAY)
+
+    @classmethod
+    def next_trading_ordinal(cls, n: 'int') -> 'int':
+        """Return the ordinal of the first trading day after n."""
+        cache = cls.cache
+        n += 1
+        while True:
+            kinds = cache.kinds
+            index = n - cache.kinds_start
+            while 0 <= index < len(kinds):
+                if kinds[index] & KIND_TRADING:
+                    return index + cache.kinds_start
+                index += 1
+
+            n = index + cache.kinds_start
+            if cls.kind_of_ordinal(n) & KIND_TRADING:
+                return n
+            n += 1
+
+    @classmethod
+    def previous_trading_ordinal(cls, n: 'int') -> 'int':
+        """Return the ordinal of the last trading day before n."""
+        cache = cls.cache
+        n -= 1
+        while True:
+            kinds = cache.kinds
+            index = n - cache.kinds_start
+            while 0 <= index < len(kinds):
+                if kinds[index] & KIND_TRADING:
+                    return index + cache.kinds_start
+                index -= 1
+
+            n = index + cache.kinds_start
+            if cls.kind_of_ordinal(n) & KIND_TRADING:
+                return n
+            n -= 1
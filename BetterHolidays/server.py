@@ -0,0 +1,381 @@
+import dataclasses as dc
+import datetime as dt
+import errno
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+import typing as t
+from .days import Day, Holiday, TradingDay, PartialTradingDay, NonTradingDay
+from .markets import MARKETS, Market
+from .markets.cache import Cache, CacheMiss
+from .utils import classproperty, iterate_date
+
+# Protocol: one JSON object per line in each direction.
+#   {"op": "markets"}                                  -> {"markets": {name: {"country": str, "weekdays": [int]}}}
+#   {"op": "days", "market": str, "dates": [iso]}      -> {"days": [day]}
+#   {"op": "years", "market": str, "years": [int]}     -> {"days": [day]}
+# Errors are returned as {"error": str, "type": exception name}.
+
+logger = logging.getLogger(__name__)
+
+Address = t.Union[str, t.Tuple[str, int]]
+
+DAY_TYPES: 'dict[str, type[Day]]' = {cls.__name__: cls for cls in (Day, Holiday, TradingDay, PartialTradingDay, NonTradingDay)}
+
+def dump_day(day: 'Day') -> 'dict':
+    data = {"type": type(day).__name__}
+    for key, value in dc.asdict(day).items():
+        data[key] = value.isoformat() if isinstance(value, (dt.date, dt.time)) else value
+    return data
+
+def load_day(data: 'dict') -> 'Day':
+    data = dict(data)
+    cls = DAY_TYPES[data.pop("type")]
+    data["date"] = dt.date.fromisoformat(data["date"])
+    for key in ("open_time", "close_time"):
+        if key in data:
+            data[key] = dt.time.fromisoformat(data[key])
+    return cls(**data)
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class CalendarServer:
+    """
+    Hosts warmed calendars for a set of markets and answers batch lookups.
+
+    Only refresh() fetches the current and future years, on one schedule. Requests are
+    answered from the cache, loading a missing past year once; years that fail to load
+    are not tried again until the next refresh.
+    """
+
+    def __init__(self, markets: 't.Optional[dict[str, type[Market]]]' = None, refresh_interval: 'float' = 24 * 60 * 60):
+        self.markets = MARKETS if markets is None else markets
+        self.refresh_interval = refresh_interval
+        self.locks = {name: threading.Lock() for name in self.markets}
+        self.loading = {name: threading.Lock() for name in self.markets}
+        self.failed: 'dict[str, set[int]]' = {name: set() for name in self.markets}
+        self.server: 't.Optional[socketserver.BaseServer]' = None
+        self.stopped = threading.Event()
+        self.refresh_thread: 't.Optional[threading.Thread]' = None
+
+    def get_market(self, name: 'str') -> 'type[Market]':
+        if name not in self.markets:
+            raise KeyError(f"Unknown market {name}")
+        return self.markets[name]
+
+    def fetch(self, name: 'str', years: 't.Iterable[int]') -> 'Cache':
+        """Fetch years of a market into a fresh cache, through a throwaway subclass so the served cache isn't touched."""
+        market = self.markets[name]
+        fresh = type(market.__name__, (market,), {})
+        for year in sorted(years):
+            fresh.day(dt.date(year, 1, 1))
+        return fresh.cache
+
+    def load_year(self, name: 'str', year: 'int'):
+        """Make sure a year of a market is cached, raising CacheMiss if it can't be."""
+        market = self.markets[name]
+        if dt.date(year, 1, 1) in market.cache:
+            return
+
+        if year >= dt.date.today().year or year in self.failed[name]:
+            raise CacheMiss(f"{name} has no data for {year}")
+
+        with self.loading[name]:
+            if dt.date(year, 1, 1) in market.cache:
+                return
+            try:
+                fresh = self.fetch(name, [year])
+            except Exception as e:
+                self.failed[name].add(year)
+                logger.exception("Failed to load %s for %s", year, name)
+                raise CacheMiss(f"{name} has no data for {year}") from e
+
+            with self.locks[name]:
+                cache = market.cache
+                for key, value in fresh.cache.items():
+                    if key.year == year:
+                        cache.set(key, value)
+
+    def get_day(self, name: 'str', date: 'dt.date') -> 'Day':
+        self.load_year(name, date.year)
+        with self.locks[name]:
+            day = self.markets[name].cache.get(date)
+        if day is None:
+            raise CacheMiss(f"{name} has no data for {date.isoformat()}")
+        return day
+
+    def handle(self, request: 'dict') -> 'dict':
+        op = request.get("op")
+        if op == "markets":
+            return {"markets": {name: {"country": market.country, "weekdays": list(market.weekdays)} for name, market in self.markets.items()}}
+
+        name = request.get("market")
+        self.get_market(name)
+        if op == "days":
+            return {"days": [dump_day(self.get_day(name, dt.date.fromisoformat(date))) for date in request["dates"]]}
+        elif op == "years":
+            days = []
+            for year in request["years"]:
+                days.extend(dump_day(self.get_day(name, day)) for day in iterate_date(dt.date(year, 1, 1), dt.date(year, 12, 31)))
+            return {"days": days}
+
+        raise ValueError(f"Unknown op {op}")
+
+    def refresh_market(self, name: 'str'):
+        """
+        Load the current and future years of a market again.
+        They're only swapped in once every year loaded, otherwise the cached calendar is kept.
+        """
+        market = self.markets[name]
+        year = dt.date.today().year
+        self.failed[name].clear()
+
+        try:
+            fresh = self.fetch(name, {year} | {cached for cached in market.cache.years() if cached > year})
+        except Exception:
+            logger.exception("Failed to refresh %s, keeping the cached calendar", name)
+            return
+
+        with self.locks[name]:
+            old = market.cache
+            for key, value in old.cache.items():
+                if key.year < year:
+                    fresh.cache[key] = value
+            fresh.sessions.update({cached: sessions for cached, sessions in old.sessions.items() if cached < year})
+            market.cache = fresh
+
+    def refresh(self):
+        """Load the current and future years of every market again."""
+        for name in self.markets:
+            self.refresh_market(name)
+
+    def _refresh_loop(self):
+        while not self.stopped.wait(self.refresh_interval):
+            self.refresh()
+
+    @staticmethod
+    def _remove_stale_socket(path: 'str'):
+        if not os.path.exists(path) or not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(path)
+            except OSError:
+                os.unlink(path)
+                return
+        raise OSError(errno.EADDRINUSE, f"A calendar server is already listening on {path}")
+
+    def serve(self, address: 'Address'):
+        """Serve on a Unix socket path or a (host, port) tuple until shutdown is called."""
+        calendar = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = calendar.handle(json.loads(line))
+                    except Exception as e:
+                        response = {"error": f"{type(e).__name__}: {e}", "type": type(e).__name__}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                    self.wfile.flush()
+
+        if isinstance(address, str):
+            self._remove_stale_socket(address)
+            server = _UnixServer(address, Handler)
+        else:
+            server = _TCPServer(address, Handler)
+
+        self.stopped.clear()
+        try:
+            self.refresh()
+            self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self.refresh_thread.start()
+            self.server = server
+            if not self.stopped.is_set():
+                server.serve_forever()
+        finally:
+            self.stopped.set()
+            server.server_close()
+            if isinstance(address, str) and os.path.exists(address):
+                os.unlink(address)
+
+    def shutdown(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+        if self.refresh_thread is not None:
+            self.refresh_thread.join()
+
+class RemoteMarket(Market):
+    """
+    Market backed by a CalendarServer.
+
+    Past years are fetched once and kept, the current and future years are
+    fetched again after ttl seconds.
+    """
+    client: 'CalendarClient'
+    ttl: 'float' = 60 * 60
+    _weekdays: 'list[int]' = []
+
+    # Years from current_year on are live: they're fetched again once expires passes.
+    current_year: 'int' = 0
+    live_start: 'int' = 1
+    expires: 'float' = float("inf")
+    live_years: 'set[int]'
+
+    country = None
+    include_country_holidays = False
+    excluded_country_holidays = []
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls.live_years = set()
+
+    @classproperty
+    def weekdays(cls):
+        return cls._weekdays
+
+    @classmethod
+    def fetch_data(cls, year: 'int'):
+        for day in cls.client.request({"op": "years", "market": cls.name, "years": [year]})["days"]:
+            day = load_day(day)
+            cls.cache.set(day.date, day)
+
+        cls.current_year = dt.date.today().year
+        cls.live_start = dt.date(cls.current_year, 1, 1).toordinal()
+        if year >= cls.current_year:
+            if not cls.live_years:
+                cls.expires = time.monotonic() + cls.ttl
+            cls.live_years.add(year)
+
+    @classmethod
+    def refresh(cls):
+        """Fetch the live years again."""
+        years = cls.live_years
+        cls.live_years = set()
+        cls.expires = float("inf")
+        for year in sorted(years):
+            cls.fetch_data(year)
+
+    @classmethod
+    def day(cls, date: 'dt.date') -> 'Day':
+        if date.year >= cls.current_year and time.monotonic() > cls.expires:
+            cls.refresh()
+        return super().day(date)
+
+    # The ordinal fast path doesn't go through day(), so it checks the ttl itself.
+    # Refreshing goes through Cache.set, which keeps the ordinal table in sync.
+
+    @classmethod
+    def _check_ttl(cls, n: 'int'):
+        """Refresh the live years if they've expired and ordinal n is in them."""
+        if n >= cls.live_start and time.monotonic() > cls.expires:
+            cls.refresh()
+
+    @classmethod
+    def kind_of_ordinal(cls, n: 'int') -> 'int':
+        cls._check_ttl(n)
+        return super().kind_of_ordinal(n)
+
+    @classmethod
+    def is_trading_ordinal(cls, n: 'int') -> 'bool':
+        cls._check_ttl(n)
+        return super().is_trading_ordinal(n)
+
+    @classmethod
+    def is_holiday_ordinal(cls, n: 'int') -> 'bool':
+        cls._check_ttl(n)
+        return super().is_holiday_ordinal(n)
+
+    @classmethod
+    def next_trading_ordinal(cls, n: 'int') -> 'int':
+        cls._check_ttl(n + 1)
+        return super().next_trading_ordinal(n)
+
+    @classmethod
+    def previous_trading_ordinal(cls, n: 'int') -> 'int':
+        cls._check_ttl(n - 1)
+        return super().previous_trading_ordinal(n)
+
+class CalendarClient:
+    """Thin client for a CalendarServer."""
+
+    def __init__(self, address: 'Address', timeout: 't.Optional[float]' = None):
+        self.address = address
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sock: 't.Optional[socket.socket]' = None
+        self.file = None
+        self.markets: 'dict[str, type[RemoteMarket]]' = {}
+
+    def connect(self):
+        if isinstance(self.address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.address)
+        self.file = self.sock.makefile("rwb")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = self.file = None
+
+    def _send(self, request: 'dict') -> 'dict':
+        if self.sock is None:
+            self.connect()
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Calendar server closed the connection")
+        return json.loads(line)
+
+    def request(self, request: 'dict') -> 'dict':
+        with self.lock:
+            try:
+                response = self._send(request)
+            except OSError:
+                self.close()
+                response = self._send(request)
+
+        if "error" in response:
+            if response.get("type") == CacheMiss.__name__:
+                raise CacheMiss(response["error"])
+            raise ValueError(response["error"])
+        return response
+
+    def days(self, market: 'str', dates: 'list[dt.date]') -> 'list[Day]':
+        return [load_day(day) for day in self.request({"op": "days", "market": market, "dates": [date.isoformat() for date in dates]})["days"]]
+
+    def market(self, name: 'str') -> 'type[RemoteMarket]':
+        if name not in self.markets:
+            info = self.request({"op": "markets"})["markets"]
+            if name not in info:
+                raise KeyError(name)
+            self.markets[name] = type(name, (RemoteMarket,), {
+                "client": self,
+                "name": name,
+                "country": info[name]["country"],
+                "_weekdays": info[name]["weekdays"],
+            })
+        return self.markets[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
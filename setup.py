@@ -19,6 +19,11 @@ setup(
         "better-md>=0.3.4"
     ],
     extras_require={},
+    entry_points={
+        "console_scripts": [
+            "better-holidays=BetterHolidays.cli:main"
+        ]
+    },
     keywords=["python", "better holidays", "better", "market", "stocks", "finance", "holidays", "better python"],
     classifiers= [
         "Development Status :: 3 - Alpha",
@@ -0,0 +1,73 @@
+import io
+import json
+import multiprocessing
+import pytest
+from BetterHolidays import NYSE, cli
+from BetterHolidays.cli import main
+from BetterHolidays.markets.holidays import GoodFriday
+
+DATES = "2024-01-01\n2001-09-17\nbad\n2150-01-01\n2024-07-05T10:00\n2024-07-06\n"
+
+def run(capsys, monkeypatch, *argv: 'str', stdin: 'str' = DATES) -> 'str':
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    main(["classify", *argv])
+    return capsys.readouterr().out
+
+def test_csv(capsys, monkeypatch):
+    assert run(capsys, monkeypatch).splitlines() == [
+        "date,kind,name,open_time,close_time",
+        "2024-01-01,holiday,New Year's Day,,",
+        "2001-09-17,partial,9/11 moment of silence,09:33:00,16:00:00",
+        "bad,invalid,,,",
+        "2150-01-01,unknown,,,",
+        "2024-07-05,trading,,09:30:00,16:00:00",
+        "2024-07-06,non-trading,,,",
+    ]
+
+def test_csv_offsets(capsys, monkeypatch):
+    lines = run(capsys, monkeypatch, "--offsets", "--no-header").splitlines()
+    assert lines[0] == "2024-01-01,holiday,New Year's Day,,,0,0"
+    assert lines[3] == "2150-01-01,unknown,,,,,"
+    open_offset, close_offset = map(int, lines[4].split(",")[-2:])
+    assert close_offset - open_offset == 6.5 * 60 * 60
+
+def test_json(capsys, monkeypatch):
+    rows = [json.loads(line) for line in run(capsys, monkeypatch, "--format", "json", "--offsets").splitlines()]
+    assert [row["kind"] for row in rows] == ["holiday", "partial", "invalid", "unknown", "trading", "non-trading"]
+    assert rows[1]["close_offset"] - rows[1]["open_offset"] == (6 * 60 + 27) * 60
+
+def test_files_and_chunks(capsys, monkeypatch, tmp_path):
+    path = tmp_path / "dates.txt"
+    path.write_text(DATES)
+    assert run(capsys, monkeypatch, str(path), "--chunk-size", "2") == run(capsys, monkeypatch, stdin=DATES)
+
+@pytest.mark.parametrize("argv", [["--chunk-size", "0"], ["--jobs", "0"], ["--jobs", "-1"]])
+def test_rejects_non_positive(capsys, monkeypatch, argv):
+    with pytest.raises(SystemExit) as e:
+        run(capsys, monkeypatch, *argv)
+    assert e.value.code == 2
+
+def test_parallel_matches_serial(capsys, monkeypatch):
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("Workers only inherit the offline stubs when forked")
+    dates = DATES * 5
+    assert run(capsys, monkeypatch, "-j", "2", "--chunk-size", "1", "--offsets", stdin=dates) == run(capsys, monkeypatch, "--offsets", stdin=dates)
+
+def test_missing_year_fetched_once(capsys, monkeypatch):
+    monkeypatch.setattr(cli, "MISSING_YEARS", {})
+    years = []
+    fetch_data = NYSE.fetch_data.__func__
+    monkeypatch.setattr(NYSE, "fetch_data", classmethod(lambda cls, year: years.append(year) or fetch_data(cls, year)))
+
+    lines = run(capsys, monkeypatch, "--chunk-size", "1", "--no-header", stdin="2150-01-01\n" * 10).splitlines()
+    assert lines == ["2150-01-01,unknown,,,"] * 10
+    assert years == [2150]
+
+def test_fetch_error_exits(capsys, monkeypatch):
+    def fail(self, year):
+        raise ValueError("Better Markdown error: offline")
+
+    monkeypatch.setattr(GoodFriday, "get_date", fail)
+    with pytest.raises(SystemExit) as e:
+        run(capsys, monkeypatch, stdin="2001-09-17\n")
+    assert "offline" in str(e.value.code)
@@ -0,0 +1,70 @@
+import datetime as dt
+import pytest
+from BetterHolidays import NYSE
+from BetterHolidays.const import KIND_NON_TRADING, KIND_TRADING, KIND_HOLIDAY, KIND_PARTIAL
+from BetterHolidays.days import day_kind
+from BetterHolidays.utils import iterate_date
+
+def ordinal(year: 'int', month: 'int', day: 'int') -> 'int':
+    return dt.date(year, month, day).toordinal()
+
+def test_matches_day():
+    NYSE.load_ordinals(2001, 2006)
+    for date in iterate_date(dt.date(2001, 1, 1), dt.date(2006, 12, 31)):
+        n = date.toordinal()
+        assert NYSE.kind_of_ordinal(n) == day_kind(NYSE.day(date))
+        assert NYSE.is_trading_ordinal(n) == NYSE.is_trading_day(date)
+        assert NYSE.is_holiday_ordinal(n) == NYSE.is_holiday(date)
+
+def test_kinds():
+    assert NYSE.kind_of_ordinal(ordinal(2024, 7, 5)) == KIND_TRADING
+    assert NYSE.kind_of_ordinal(ordinal(2024, 7, 4)) == KIND_HOLIDAY
+    assert NYSE.kind_of_ordinal(ordinal(2024, 7, 6)) == KIND_NON_TRADING
+    assert NYSE.kind_of_ordinal(ordinal(2001, 9, 17)) == KIND_PARTIAL
+
+def test_next_and_previous():
+    # 2001-09-11 to 2001-09-14 were closed, 2001-09-15/16 was a weekend
+    assert NYSE.next_trading_ordinal(ordinal(2001, 9, 10)) == ordinal(2001, 9, 17)
+    assert NYSE.previous_trading_ordinal(ordinal(2001, 9, 17)) == ordinal(2001, 9, 10)
+    # Across the edges of the table
+    NYSE.load_ordinals(2010)
+    assert NYSE.next_trading_ordinal(ordinal(2010, 12, 31)) == ordinal(2011, 1, 3)
+    assert NYSE.previous_trading_ordinal(ordinal(2010, 1, 4)) == ordinal(2009, 12, 31)
+
+def test_far_lookup_doesnt_fill_gap(monkeypatch):
+    NYSE.load_ordinals(1979)
+    years = []
+    fetch_past = NYSE.fetch_past.__func__
+    monkeypatch.setattr(NYSE, "fetch_past", classmethod(lambda cls, year: years.append(year) or fetch_past(cls, year)))
+
+    assert NYSE.kind_of_ordinal(ordinal(1900, 1, 1)) == KIND_HOLIDAY
+    assert years == [1900]
+    assert NYSE.cache.kinds_start == ordinal(1979, 1, 1)
+
+    NYSE.kind_of_ordinal(ordinal(1975, 6, 2))
+    assert sorted(years) == [1900, 1975, 1976, 1977, 1978]
+    assert NYSE.cache.kinds_start == ordinal(1975, 1, 1)
+
+@pytest.mark.parametrize("n", [0, -1, dt.date.max.toordinal() + 1])
+def test_out_of_range(n):
+    NYSE.load_ordinals(2000)
+    with pytest.raises(ValueError, match="out of range"):
+        NYSE.kind_of_ordinal(n)
+
+def test_set_updates_table():
+    NYSE.load_ordinals(2003)
+    date = dt.date(2003, 7, 7)
+    NYSE.cache.set(date, NYSE.day(dt.date(2003, 7, 4)))
+    assert NYSE.kind_of_ordinal(date.toordinal()) == KIND_HOLIDAY
+
+def test_pop_drops_table():
+    NYSE.load_ordinals(2003)
+    NYSE.cache.pop(dt.date(2003, 7, 7))
+    assert not NYSE.cache.kinds
+    assert NYSE.kind_of_ordinal(ordinal(2003, 7, 7)) == KIND_TRADING
+
+def test_clear_year_drops_table():
+    NYSE.load_ordinals(2003, 2004)
+    NYSE.cache.clear_year(2004)
+    assert not NYSE.cache.kinds
+    assert NYSE.kind_of_ordinal(ordinal(2004, 7, 5)) == KIND_HOLIDAY
@@ -0,0 +1,160 @@
+import datetime as dt
+import os
+import socket
+import tempfile
+import threading
+import time
+import socketserver
+import pytest
+from BetterHolidays import NYSE, Holiday
+from BetterHolidays.markets.cache import CacheMiss
+from BetterHolidays.markets.holidays import GoodFriday
+from BetterHolidays.server import CalendarServer, CalendarClient
+
+def start(path: 'str') -> 'tuple[CalendarServer, threading.Thread]':
+    calendar = CalendarServer({"NYSE": NYSE})
+    thread = threading.Thread(target=calendar.serve, args=(path,), daemon=True)
+    thread.start()
+    while calendar.server is None:
+        time.sleep(0.01)
+    return calendar, thread
+
+def stop(calendar: 'CalendarServer', thread: 'threading.Thread'):
+    calendar.shutdown()
+    thread.join()
+
+@pytest.fixture
+def server():
+    path = os.path.join(tempfile.mkdtemp(), "bh.sock")
+    calendar, thread = start(path)
+    yield calendar, path
+    stop(calendar, thread)
+
+def count_fetches(monkeypatch) -> 'list[int]':
+    years = []
+    fetch_data = NYSE.fetch_data.__func__
+    monkeypatch.setattr(NYSE, "fetch_data", classmethod(lambda cls, year: years.append(year) or fetch_data(cls, year)))
+    return years
+
+def test_round_trip(server):
+    _, path = server
+    with CalendarClient(path) as client:
+        market = client.market("NYSE")
+        assert market.weekdays == [0, 1, 2, 3, 4]
+        assert market.day(dt.date(2001, 9, 17)) == NYSE.day(dt.date(2001, 9, 17))
+        assert market.is_holiday(dt.date(2012, 10, 29))
+        assert not market.is_trading_day(dt.date(2024, 7, 6))
+        assert client.days("NYSE", [dt.date(2024, 7, 4)]) == [NYSE.day(dt.date(2024, 7, 4))]
+
+        with pytest.raises(KeyError):
+            client.market("XNYS")
+        with pytest.raises(ValueError):
+            client.request({"op": "days", "market": "NYSE", "dates": ["bad"]})
+
+def test_client_refreshes_live_years(server):
+    _, path = server
+    with CalendarClient(path) as client:
+        market = client.market("NYSE")
+        date = dt.date(dt.date.today().year, 7, 7)
+        while not NYSE.is_trading_day(date):
+            date += dt.timedelta(days=1)
+        assert market.is_trading_day(date)
+
+        NYSE.cache.set(date, Holiday(date=date, name="Closed"))
+        assert market.is_trading_day(date)
+
+        market.expires = time.monotonic() - 1
+        assert not market.is_trading_day(date)
+
+def test_refresh_keeps_cache_on_failure(monkeypatch):
+    calendar = CalendarServer({"NYSE": NYSE})
+    year = dt.date.today().year
+    day = NYSE.day(dt.date(year, 1, 1))
+    past = NYSE.day(dt.date(2001, 9, 17))
+
+    def fail(cls):
+        raise ValueError("upstream down")
+
+    monkeypatch.setattr(NYSE, "fetch_future", classmethod(fail))
+    calendar.refresh()
+    assert NYSE.cache.get(dt.date(year, 1, 1)) == day
+    assert NYSE.cache.get(dt.date(2001, 9, 17)) == past
+
+def test_refresh_swaps_in_new_cache():
+    calendar = CalendarServer({"NYSE": NYSE})
+    year = dt.date.today().year
+    date = dt.date(year, 1, 1)
+    NYSE.day(dt.date(2001, 9, 17))
+    stale = Holiday(date=date, name="Stale")
+    NYSE.cache.set(date, stale)
+
+    calendar.refresh()
+    assert NYSE.day(date) != stale
+    assert dt.date(2001, 9, 17) in NYSE.cache
+
+def test_client_ordinals_refresh_live_years(server):
+    _, path = server
+    with CalendarClient(path) as client:
+        market = client.market("NYSE")
+        date = dt.date(dt.date.today().year, 7, 7)
+        while not NYSE.is_trading_day(date):
+            date += dt.timedelta(days=1)
+        n = date.toordinal()
+        assert market.is_trading_ordinal(n)
+
+        NYSE.cache.set(date, Holiday(date=date, name="Closed"))
+        assert market.is_trading_ordinal(n)
+
+        market.expires = time.monotonic() - 1
+        assert not market.is_trading_ordinal(n)
+        assert market.is_holiday_ordinal(n)
+        assert market.next_trading_ordinal(n - 1) > n
+
+def test_requests_dont_fetch_live_years(server, monkeypatch):
+    _, path = server
+    years = count_fetches(monkeypatch)
+    with CalendarClient(path) as client:
+        for _ in range(3):
+            with pytest.raises(CacheMiss):
+                client.request({"op": "years", "market": "NYSE", "years": [2150]})
+    assert years == []
+
+def test_failed_past_year_not_retried(server, monkeypatch):
+    calendar, path = server
+    years = count_fetches(monkeypatch)
+
+    def fail(self, year):
+        raise ValueError("Better Markdown error: offline")
+
+    offline = GoodFriday.get_date
+    monkeypatch.setattr(GoodFriday, "get_date", fail)
+    with CalendarClient(path) as client:
+        for _ in range(3):
+            with pytest.raises(CacheMiss):
+                client.days("NYSE", [dt.date(1950, 6, 1)])
+        assert years == [1950]
+
+        monkeypatch.setattr(GoodFriday, "get_date", offline)
+        calendar.refresh()
+        assert client.days("NYSE", [dt.date(1950, 6, 1)]) == [NYSE.day(dt.date(1950, 6, 1))]
+
+def test_restart_on_same_path():
+    path = os.path.join(tempfile.mkdtemp(), "bh.sock")
+    calendar, thread = start(path)
+
+    with pytest.raises(OSError):
+        CalendarServer({"NYSE": NYSE}).serve(path)
+
+    stop(calendar, thread)
+    assert not os.path.exists(path)
+    assert not calendar.refresh_thread.is_alive()
+    assert not socketserver.ThreadingUnixStreamServer.daemon_threads
+    assert not socketserver.ThreadingTCPServer.allow_reuse_address
+
+    # A socket file left behind by a crashed server is replaced
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(path)
+    calendar, thread = start(path)
+    with CalendarClient(path) as client:
+        assert client.market("NYSE").is_holiday(dt.date(2012, 10, 29))
+    stop(calendar, thread)
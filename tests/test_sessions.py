@@ -0,0 +1,56 @@
+import datetime as dt
+import random
+from BetterHolidays import NYSE
+
+def brute_open_seconds(start: 'dt.datetime', end: 'dt.datetime') -> 'float':
+    seconds = 0
+    for day in NYSE.get_trading_days(start.date(), end.date()):
+        open_time = max(dt.datetime.combine(day.date, day.open_time), start)
+        close_time = min(dt.datetime.combine(day.date, day.close_time), end)
+        if close_time > open_time:
+            seconds += (close_time - open_time).total_seconds()
+    return seconds
+
+def test_session_length():
+    assert NYSE.session_length(NYSE.day(dt.date(2024, 7, 5))) == 6.5 * 60 * 60
+    assert NYSE.session_length(NYSE.day(dt.date(2024, 7, 4))) == 0
+    assert NYSE.session_length(NYSE.day(dt.date(2024, 7, 6))) == 0
+
+def test_late_open():
+    # 2002-09-11 opened at noon
+    start = dt.datetime(2002, 9, 11)
+    assert NYSE.open_seconds_between(start, dt.datetime(2002, 9, 12)) == 4 * 60 * 60
+    assert NYSE.offset_open_time(start, 60) == dt.datetime(2002, 9, 11, 12, 1)
+
+def test_early_close():
+    # 2005-06-01 closed at 15:36
+    start = dt.datetime(2005, 6, 1)
+    assert NYSE.open_seconds_between(start, dt.datetime(2005, 6, 2)) == (6 * 60 + 6) * 60
+    assert NYSE.offset_open_time(start, (6 * 60 + 6) * 60) == dt.datetime(2005, 6, 1, 15, 36)
+
+def test_cross_year():
+    start = dt.datetime(2001, 12, 31, 15)
+    end = dt.datetime(2002, 1, 2, 10)
+    assert NYSE.open_seconds_between(start, end) == 90 * 60
+    assert NYSE.open_seconds_between(end, start) == -90 * 60
+    assert NYSE.offset_open_time(start, 90 * 60) == end
+    assert NYSE.offset_open_time(end, -90 * 60) == start
+
+def test_against_brute_force():
+    rng = random.Random(0)
+    for _ in range(100):
+        start = dt.datetime(2000, 1, 1) + dt.timedelta(seconds=rng.randrange(365 * 24 * 60 * 60 * 8))
+        end = start + dt.timedelta(seconds=rng.randrange(800 * 24 * 60 * 60))
+        seconds = brute_open_seconds(start, end)
+        assert NYSE.open_seconds_between(start, end) == seconds
+        assert NYSE.open_seconds_between(end, start) == -seconds
+
+        offset = rng.randrange(1, int(max(seconds, 1)) + 1)
+        assert NYSE.open_seconds_between(start, NYSE.offset_open_time(start, offset)) == offset
+        assert NYSE.open_seconds_between(NYSE.offset_open_time(end, -offset), end) == offset
+
+def test_sessions_invalidated_on_set():
+    total = NYSE.get_sessions(2003)[-1]
+    day = NYSE.day(dt.date(2003, 7, 7))
+    NYSE.cache.set(day.date, NYSE.day(dt.date(2003, 7, 4)))
+    assert NYSE.get_sessions(2003)[-1] == total - NYSE.session_length(day)